@@ -8,6 +8,16 @@ and generate a proposal response.
 import os
 import json
 import logging
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+try:
+    import orjson # Faster serialization of knowledge base payloads, if installed
+except ImportError:
+    orjson = None
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
@@ -23,33 +33,196 @@ from review_refinement_module.module_logic import ReviewRefinementModule
 from output_generation_module.module_logic import OutputGenerationModule
 from knowledge_base_learning_module.module_logic import KnowledgeBaseLearningModule
 
+# Worker threads for pipeline stages that only depend on earlier outputs and can
+# overlap (compliance || strategy, costing || content/visuals). Shared by every
+# process_rfp call on an agent, so concurrent RFPs flow through the same pool.
+PIPELINE_STAGE_WORKERS = 4
+
+# Heavy modules shared by every AiRfpAgent in the process, keyed by (module, KB directory),
+# so each agent doesn't load (and index) its own copy of the same knowledge base.
+_shared_modules = {}
+_shared_modules_lock = threading.RLock()
+
+def _get_shared_module(name, knowledge_base_dir, factory):
+    key = (name, os.path.abspath(knowledge_base_dir))
+    with _shared_modules_lock:
+        module = _shared_modules.get(key)
+        if module is None:
+            module = factory()
+            _shared_modules[key] = module
+        return module
+
+def get_shared_knowledge_manager(knowledge_base_dir):
+    """Return the process-wide KnowledgeBaseLearningModule for knowledge_base_dir."""
+    return _get_shared_module("knowledge_manager", knowledge_base_dir,
+                              lambda: KnowledgeBaseLearningModule(knowledge_base_dir=knowledge_base_dir))
+
+def get_shared_content_generator(knowledge_base_dir):
+    """Return the process-wide ContentGenerator using the knowledge manager for knowledge_base_dir."""
+    return _get_shared_module("content_generator", knowledge_base_dir,
+                              lambda: ContentGenerator(kb_module=get_shared_knowledge_manager(knowledge_base_dir)))
+
+def _update_knowledge_base(knowledge_manager, rfp_id, proposal_title, rfp_analysis_data, compliance_matrix,
+                           strategy_elements, generated_content, cost_proposal, review_feedback):
+    """Step 9: stores insights, feedback, best practices and lessons learned from a processed RFP."""
+    logging.info(f"Updating knowledge base for RFP ID: {rfp_id}")
+    try:
+        outcome_for_kb = "Processed" # This could be updated later based on actual submission outcome
+        if rfp_analysis_data: 
+            knowledge_manager.store_rfp_insight(
+                rfp_id=rfp_id, 
+                insight_type="Initial RFP Analysis Summary", 
+                content=dumps_json(rfp_analysis_data, indent=True),
+                keywords=rfp_analysis_data.get("agency_priorities", []) + ["analysis"], 
+                outcome=outcome_for_kb,
+                client_industry=rfp_analysis_data.get("client_industry"),
+                project_domain=rfp_analysis_data.get("project_domain")
+            )
+        if compliance_matrix:
+            for i, item in enumerate(compliance_matrix[:3]): # Store first 3 compliance items as insights
+                item_id = item.get("ID", f"Item_{i+1}")
+                knowledge_manager.store_rfp_insight(
+                    rfp_id=rfp_id, 
+                    insight_type=f'Compliance Item: {item_id}', 
+                    content=item.get("Requirement Text", "N/A"), 
+                    keywords=["compliance", item_id], 
+                    outcome=outcome_for_kb,
+                    client_industry=rfp_analysis_data.get("client_industry"),
+                    project_domain=rfp_analysis_data.get("project_domain"),
+                    related_section=f"Compliance Matrix {item_id}"
+                )
+        if review_feedback.get("detailed_feedback"):
+            for feedback_item in review_feedback.get("detailed_feedback", []):
+                knowledge_manager.store_proposal_feedback(
+                    rfp_id=rfp_id, 
+                    proposal_version="v1.0", 
+                    feedback_source=review_feedback.get("review_stage", "Unknown Review Stage"), 
+                    feedback_text=feedback_item.get("comment", "N/A"), 
+                    sentiment=feedback_item.get("severity", "Neutral"), # Or map severity to sentiment
+                    related_section=feedback_item.get("section")
+                )
+        if strategy_elements.get("win_themes"):
+             knowledge_manager.store_best_practice(
+                title=f"Strategy Highlights for {proposal_title}", 
+                description=dumps_json(strategy_elements.get("win_themes")), 
+                category="Proposal Strategy", 
+                keywords=["strategy", rfp_id],
+                applicability=f"{rfp_analysis_data.get('client_industry', 'General')} RFPs"
+            )
+        # Example of storing a lesson learned (could be more dynamic based on actual outcomes/analysis)
+        if generated_content.get("executive_summary") and cost_proposal.get("summary"):
+            knowledge_manager.store_lesson_learned(
+                rfp_id=rfp_id,
+                lesson_title="Post-Generation Sanity Check",
+                description="Ensured all key components (summary, costing) were generated.",
+                impact="Positive - Process Verification",
+                recommendation="Continue automated checks for completeness.",
+                keywords=["process", "validation"],
+                related_section="Overall Process"
+            )
+        logging.info("Knowledge base update process completed with enhanced data.")
+    except Exception as e:
+        logging.error(f"Error during Knowledge Base Update for RFP ID {rfp_id}: {e}", exc_info=True)
+
+def _run_kb_writer(knowledge_base_dir, update_queue):
+    """Applies queued knowledge base updates one at a time, in submission order."""
+    knowledge_manager = get_shared_knowledge_manager(knowledge_base_dir)
+    while True:
+        update = update_queue.get()
+        try:
+            _update_knowledge_base(knowledge_manager, *update)
+        finally:
+            update_queue.task_done()
+
+def _start_kb_writer(knowledge_base_dir):
+    update_queue = queue.Queue()
+    threading.Thread(target=_run_kb_writer, args=(knowledge_base_dir, update_queue),
+                     name="kb-writer", daemon=True).start()
+    # Pending writes are flushed before the interpreter exits
+    atexit.register(update_queue.join)
+    return update_queue
+
+def get_shared_kb_update_queue(knowledge_base_dir):
+    """Return the process-wide update queue for knowledge_base_dir, drained by its single writer thread."""
+    return _get_shared_module("kb_update_queue", knowledge_base_dir, lambda: _start_kb_writer(knowledge_base_dir))
+
+def dumps_json(obj, indent=False):
+    """Serializes obj to a JSON string, using str() for values JSON can't represent."""
+    if orjson:
+        # Pass dates and dataclasses to default=str so the output matches the json fallback
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                  | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=str, option=option).decode()
+        except orjson.JSONEncodeError:
+            pass # e.g. integers beyond 64 bits, which json handles
+    return json.dumps(obj, indent=2 if indent else None, default=str)
+
 class AiRfpAgent:
-    def __init__(self):
-        """Initialize the AI RFP Agent and its modules."""
+    def __init__(self, ocr_workers=None, kb_writer=True):
+        """Initialize the AI RFP Agent. Its modules are created on first use.
+
+        ocr_workers caps the OCR processes used per PDF (default: one per CPU). With
+        kb_writer=False, knowledge base updates are only queued, for the caller to collect
+        with take_kb_updates() and apply through another agent.
+        """
         logging.info("AI RFP Agent Initializing...")
         
-        generated_proposals_dir = "./generated_proposals"
-        knowledge_base_data_dir = "./knowledge_base_data"
+        self.generated_proposals_dir = "./generated_proposals"
+        self.knowledge_base_data_dir = "./knowledge_base_data"
+        self.ocr_workers = ocr_workers
 
-        try:
-            # Knowledge Manager must be initialized before Content Generator
-            self.knowledge_manager = KnowledgeBaseLearningModule(knowledge_base_dir=knowledge_base_data_dir)
-            
-            self.input_processor = InputProcessor()
-            self.rfp_analyzer = RFPAnalyzer()
-            self.compliance_strategist = ComplianceStrategyDeveloper()
-            # Pass the knowledge_manager instance to ContentGenerator
-            self.content_generator = ContentGenerator(kb_module=self.knowledge_manager) 
-            self.visual_integrator = VisualElementIntegrator()
-            self.cost_pricer = CostingPricingModule()
-            self.reviewer = ReviewRefinementModule()
-            self.output_generator = OutputGenerationModule(output_directory=generated_proposals_dir)
-            # self.knowledge_manager is already initialized above
-            
-            logging.info("AI RFP Agent Initialized with all modules (ContentGenerator now uses KnowledgeManager).")
-        except Exception as e:
-            logging.error(f"Error during AiRfpAgent initialization: {e}", exc_info=True)
-            raise
+        self.stage_executor = ThreadPoolExecutor(max_workers=PIPELINE_STAGE_WORKERS, thread_name_prefix="rfp-stage")
+
+        # Knowledge base writes from every agent using this KB directory go through one
+        # shared writer thread, so concurrent read-modify-writes can't lose entries
+        if kb_writer:
+            self._kb_update_queue = get_shared_kb_update_queue(self.knowledge_base_data_dir)
+        else:
+            self._kb_update_queue = queue.Queue()
+        
+        logging.info("AI RFP Agent Initialized (modules are loaded on first use).")
+
+    # Modules are created lazily, so callers that only use part of the pipeline
+    # (e.g. the /analyze endpoint) don't pay for loading the rest.
+    @cached_property
+    def knowledge_manager(self):
+        return get_shared_knowledge_manager(self.knowledge_base_data_dir)
+
+    @cached_property
+    def input_processor(self):
+        return InputProcessor(max_workers=self.ocr_workers)
+
+    @cached_property
+    def rfp_analyzer(self):
+        return RFPAnalyzer()
+
+    @cached_property
+    def compliance_strategist(self):
+        return ComplianceStrategyDeveloper()
+
+    @cached_property
+    def content_generator(self):
+        # Uses the shared knowledge manager for this agent's KB directory
+        return get_shared_content_generator(self.knowledge_base_data_dir)
+
+    @cached_property
+    def visual_integrator(self):
+        return VisualElementIntegrator()
+
+    @cached_property
+    def cost_pricer(self):
+        return CostingPricingModule()
+
+    @cached_property
+    def reviewer(self):
+        return ReviewRefinementModule()
+
+    @cached_property
+    def output_generator(self):
+        return OutputGenerationModule(output_directory=self.generated_proposals_dir)
 
     def process_rfp(self, rfp_file_path, rfp_id, proposal_title, supplementary_docs=None):
         """Process an RFP and generate a response."""
@@ -87,10 +260,18 @@ class AiRfpAgent:
             rfp_analysis_data.setdefault("technical_keywords", []) # Default if not found
             logging.info("RFP analysis complete.")
 
+            # Step 6 only needs the analysis, so start Costing & Pricing now and let it
+            # run alongside Steps 3-5. Compliance and strategy are independent siblings.
+            logging.info("Step 6: Costing & Pricing (started in parallel)")
+            tech_summary = {"complexity_score": rfp_analysis_data.get("complexity_score", 1.1)}
+            cost_future = self.stage_executor.submit(self.cost_pricer.develop_cost_proposal, rfp_analysis_output=rfp_analysis_data, technical_proposal_summary=tech_summary)
+
             # Step 3: Compliance & Strategy
             logging.info("Step 3: Compliance & Strategy Development")
-            compliance_matrix = self.compliance_strategist.generate_compliance_matrix(rfp_analysis_results=rfp_analysis_data)
-            strategy_elements = self.compliance_strategist.develop_initial_strategy(rfp_analysis_results=rfp_analysis_data)
+            compliance_future = self.stage_executor.submit(self.compliance_strategist.generate_compliance_matrix, rfp_analysis_results=rfp_analysis_data)
+            strategy_future = self.stage_executor.submit(self.compliance_strategist.develop_initial_strategy, rfp_analysis_results=rfp_analysis_data)
+            compliance_matrix = compliance_future.result()
+            strategy_elements = strategy_future.result()
             logging.info(f"Compliance matrix generated ({len(compliance_matrix)} items). Strategy elements developed.")
 
             # Step 4: Content Generation (now uses enhanced RAG)
@@ -103,10 +284,7 @@ class AiRfpAgent:
             content_with_visuals = self.visual_integrator.identify_and_integrate_visuals(proposal_content=generated_content)
             logging.info("Visual elements integrated/suggested.")
 
-            # Step 6: Costing & Pricing
-            logging.info("Step 6: Costing & Pricing")
-            tech_summary = {"complexity_score": rfp_analysis_data.get("complexity_score", 1.1)}
-            cost_proposal = self.cost_pricer.develop_cost_proposal(rfp_analysis_output=rfp_analysis_data, technical_proposal_summary=tech_summary)
+            cost_proposal = cost_future.result()
             logging.info("Cost proposal developed.")
 
             # Step 7: Review & Refinement
@@ -135,68 +313,33 @@ class AiRfpAgent:
             logging.error(f"Error during RFP processing pipeline (Steps 1-8) for RFP ID {rfp_id}: {e}", exc_info=True)
 
         # Step 9: Knowledge Base Update (attempt even if prior steps had issues, if some data exists)
-        logging.info("Step 9: Knowledge Base Update with Enhanced Data")
-        try:
-            outcome_for_kb = "Processed" # This could be updated later based on actual submission outcome
-            if rfp_analysis_data: 
-                self.knowledge_manager.store_rfp_insight(
-                    rfp_id=rfp_id, 
-                    insight_type="Initial RFP Analysis Summary", 
-                    content=json.dumps(rfp_analysis_data, indent=2, default=str),
-                    keywords=rfp_analysis_data.get("agency_priorities", []) + ["analysis"], 
-                    outcome=outcome_for_kb,
-                    client_industry=rfp_analysis_data.get("client_industry"),
-                    project_domain=rfp_analysis_data.get("project_domain")
-                )
-            if compliance_matrix:
-                for i, item in enumerate(compliance_matrix[:3]): # Store first 3 compliance items as insights
-                    item_id = item.get("ID", f"Item_{i+1}")
-                    self.knowledge_manager.store_rfp_insight(
-                        rfp_id=rfp_id, 
-                        insight_type=f'Compliance Item: {item_id}', 
-                        content=item.get("Requirement Text", "N/A"), 
-                        keywords=["compliance", item_id], 
-                        outcome=outcome_for_kb,
-                        client_industry=rfp_analysis_data.get("client_industry"),
-                        project_domain=rfp_analysis_data.get("project_domain"),
-                        related_section=f"Compliance Matrix {item_id}"
-                    )
-            if review_feedback.get("detailed_feedback"):
-                for feedback_item in review_feedback.get("detailed_feedback", []):
-                    self.knowledge_manager.store_proposal_feedback(
-                        rfp_id=rfp_id, 
-                        proposal_version="v1.0", 
-                        feedback_source=review_feedback.get("review_stage", "Unknown Review Stage"), 
-                        feedback_text=feedback_item.get("comment", "N/A"), 
-                        sentiment=feedback_item.get("severity", "Neutral"), # Or map severity to sentiment
-                        related_section=feedback_item.get("section")
-                    )
-            if strategy_elements.get("win_themes"):
-                 self.knowledge_manager.store_best_practice(
-                    title=f"Strategy Highlights for {proposal_title}", 
-                    description=json.dumps(strategy_elements.get("win_themes"), default=str), 
-                    category="Proposal Strategy", 
-                    keywords=["strategy", rfp_id],
-                    applicability=f"{rfp_analysis_data.get('client_industry', 'General')} RFPs"
-                )
-            # Example of storing a lesson learned (could be more dynamic based on actual outcomes/analysis)
-            if generated_content.get("executive_summary") and cost_proposal.get("summary"):
-                self.knowledge_manager.store_lesson_learned(
-                    rfp_id=rfp_id,
-                    lesson_title="Post-Generation Sanity Check",
-                    description="Ensured all key components (summary, costing) were generated.",
-                    impact="Positive - Process Verification",
-                    recommendation="Continue automated checks for completeness.",
-                    keywords=["process", "validation"],
-                    related_section="Overall Process"
-                )
-            logging.info("Knowledge base update process completed with enhanced data.")
-        except Exception as e:
-            logging.error(f"Error during Knowledge Base Update for RFP ID {rfp_id}: {e}", exc_info=True)
+        # Handed to the KB writer thread so the writes stay off the caller's critical path
+        logging.info("Step 9: Knowledge Base Update with Enhanced Data (queued)")
+        self._kb_update_queue.put((rfp_id, proposal_title, rfp_analysis_data, compliance_matrix, strategy_elements,
+                                   generated_content, cost_proposal, review_feedback))
 
         logging.info(f"--- RFP Processing Finished for RFP ID: {rfp_id} ---")
         return output_file_paths
 
+    def wait_for_kb_updates(self):
+        """Blocks until every queued knowledge base update has been written."""
+        self._kb_update_queue.join()
+
+    def take_kb_updates(self):
+        """Removes and returns the queued knowledge base updates, unwritten (kb_writer=False agents)."""
+        updates = []
+        while True:
+            try:
+                updates.append(self._kb_update_queue.get_nowait())
+            except queue.Empty:
+                return updates
+            self._kb_update_queue.task_done()
+
+    def queue_kb_updates(self, updates):
+        """Queues knowledge base updates taken from another agent with take_kb_updates()."""
+        for update in updates:
+            self._kb_update_queue.put(update)
+
 if __name__ == "__main__":
     logging.info("Starting AI RFP Agent main script execution example (Phase 3 RAG Test)...")
     
@@ -215,7 +358,7 @@ if __name__ == "__main__":
         # And the ContentGenerator test populates its own temp KB.
         # For a full agent run, ensure `knowledge_base_data` has relevant test data.
         # Let's add a sample item to the main KB for the agent.py run to pick up.
-        temp_kb_for_agent_run = KnowledgeBaseLearningModule(knowledge_base_dir=kb_data_path)
+        temp_kb_for_agent_run = get_shared_knowledge_manager(kb_data_path)
         if not temp_kb_for_agent_run._read_kb(temp_kb_for_agent_run.insights_file): # if empty
             temp_kb_for_agent_run.store_rfp_insight("RFP-GENERAL-000", "Generic Insight", "Always address client pain points directly.", ["pain points", "client focus"], "Won", "General", "Strategy", "Executive Summary")
             temp_kb_for_agent_run.store_best_practice("General Proposal Tip", "Use clear and concise language.", "Writing Style", ["clarity", "writing"], "All proposals")
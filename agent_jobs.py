@@ -0,0 +1,42 @@
+"""
+Executor for agent work submitted by the API.
+
+Jobs run on a bounded thread pool with per-program backpressure, and carry the
+submitting request's context (Flask request and request_ctx) into the worker thread.
+"""
+
+import os
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import copy_current_request_context
+
+# Bounded pool for agent work so request handlers don't hold a server worker
+# for a whole LLM + RAG round-trip
+executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4))
+
+# Backpressure per agent program: callers wait up to AGENT_QUEUE_TIMEOUT seconds
+# for a slot and get a 429 if none frees up
+AGENT_QUEUE_TIMEOUT = 30
+AGENT_PROGRAM_SLOTS = {
+    "generate": threading.Semaphore(4),
+    "analyze": threading.Semaphore(8)
+}
+
+# Per-request context (request ID, caller settings). Copied into executor threads
+# with the job so agent work never falls back to another request's values.
+request_ctx = contextvars.ContextVar('request_ctx', default=None)
+
+def submit_agent_job(program, fn, *args, **kwargs):
+    """Submit fn to the executor, or return None if the program has no free slot."""
+    slots = AGENT_PROGRAM_SLOTS[program]
+    if not slots.acquire(timeout=AGENT_QUEUE_TIMEOUT):
+        return None
+    try:
+        ctx = contextvars.copy_context()
+        future = executor.submit(ctx.run, copy_current_request_context(fn), *args, **kwargs)
+    except Exception:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
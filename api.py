@@ -1,35 +1,168 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 import os
 import sys
 import json
 import logging
+import re
+import threading
+import time
+import uuid
 from werkzeug.utils import secure_filename
 
+try:
+    import orjson # Faster JSON parsing/serialization for KB files and API payloads, if installed
+except ImportError:
+    orjson = None
+
 # Add parent directory to path to import agent modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the AI RFP Agent
 from agent import AiRfpAgent
+from agent_jobs import request_ctx, submit_agent_job
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, used for request parsing and jsonify."""
+
+    def dumps(self, obj, **kwargs):
+        # Dates and dataclasses go through Flask's default() as with the stock provider
+        # (HTTP dates, asdict) instead of orjson's native ISO 8601/field serialization
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stock json provider handles
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+if orjson:
+    app.json = OrjsonProvider(app)
 
 # Initialize the AI RFP Agent
 agent = AiRfpAgent()
 
+# Registry of proposal generation jobs, keyed by proposal ID. Completed and failed
+# jobs are kept for PROPOSAL_JOB_TTL seconds so clients can poll their status.
+PROPOSAL_JOB_TTL = 3600
+proposal_jobs = {}
+proposal_jobs_lock = threading.Lock()
+
+def update_proposal_job(proposal_id, **fields):
+    if fields.get("status") in ("completed", "failed"):
+        fields["finished_at"] = time.monotonic()
+    with proposal_jobs_lock:
+        proposal_jobs[proposal_id].update(fields)
+
+def evict_expired_proposal_jobs():
+    """Drop finished jobs older than PROPOSAL_JOB_TTL. Caller holds proposal_jobs_lock."""
+    cutoff = time.monotonic() - PROPOSAL_JOB_TTL
+    expired = [proposal_id for proposal_id, job in proposal_jobs.items()
+               if job.get("finished_at") is not None and job["finished_at"] < cutoff]
+    for proposal_id in expired:
+        del proposal_jobs[proposal_id]
+
+def run_proposal_job(proposal_id, file_path, rfp_id, title):
+    request_id = (request_ctx.get() or {}).get("request_id")
+    logging.info(f"Starting proposal job {proposal_id} for request {request_id}")
+    update_proposal_job(proposal_id, status="in_progress", progress=10, message="Proposal generation in progress")
+    try:
+        output_file_paths = agent.process_rfp(file_path, rfp_id, title)
+    except Exception as e:
+        logging.error(f"Error generating proposal {proposal_id}: {e}", exc_info=True)
+        update_proposal_job(proposal_id, status="failed", progress=100, message=str(e))
+        return
+
+    if not output_file_paths:
+        update_proposal_job(proposal_id, status="failed", progress=100, message="Failed to generate proposal")
+        return
+
+    update_proposal_job(proposal_id, status="completed", progress=100,
+                        message="Proposal generation completed successfully",
+                        output_files=output_file_paths)
+
 # Configure upload folder
 UPLOAD_FOLDER = './uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
 
 # Configure allowed extensions
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'doc'}
+ALLOWED_FILE_RE = re.compile(r'.*\.(%s)\Z' % '|'.join(sorted(ALLOWED_EXTENSIONS)), re.IGNORECASE | re.DOTALL)
+
+# Knowledge base files searched by /api/knowledge: (category, filename, title field, content field)
+KNOWLEDGE_BASE_DIR = './knowledge_base_data'
+KNOWLEDGE_SOURCES = [
+    ("rfp_insights", "rfp_insights.json", "insight_type", "content"),
+    ("best_practices", "best_practices.json", "title", "description")
+]
+
+# Resident search index: file path -> ((mtime_ns, size), [(lowercased content, result)]).
+# Entries are rebuilt only when the file on disk changes, not on every request.
+knowledge_index = {}
+knowledge_index_lock = threading.Lock()
+
+def load_knowledge_entries(file_path, category, title_field, content_field):
+    """Return the searchable entries for a KB file, re-reading it only if it changed."""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return []
+    version = (st.st_mtime_ns, st.st_size)
+    
+    with knowledge_index_lock:
+        cached = knowledge_index.get(file_path)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    items = orjson.loads(raw) if orjson else json.loads(raw)
+    entries = [
+        (item.get(content_field, '').lower(), {
+            "id": item.get('id', ''),
+            "title": item.get(title_field, ''),
+            "content": item.get(content_field, ''),
+            "category": category,
+            "keywords": item.get('keywords', []),
+            "date": item.get('timestamp', '')
+        })
+        for item in items
+    ]
+    
+    with knowledge_index_lock:
+        knowledge_index[file_path] = (version, entries)
+    return entries
+
+def warm_knowledge_index():
+    """Load the KB search index ahead of the first /api/knowledge request."""
+    for source_category, filename, title_field, content_field in KNOWLEDGE_SOURCES:
+        try:
+            load_knowledge_entries(os.path.join(KNOWLEDGE_BASE_DIR, filename), source_category, title_field, content_field)
+        except Exception as e:
+            logging.warning(f"Could not warm knowledge index from {filename}: {e}")
+
+# Read and parse the KB files in the background at startup, so the first search
+# doesn't pay for the disk reads
+threading.Thread(target=warm_knowledge_index, name="kb-warmup", daemon=True).start()
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return ALLOWED_FILE_RE.match(filename) is not None
+
+@app.before_request
+def set_request_context():
+    request_ctx.set({"request_id": request.headers.get('X-Request-ID') or uuid.uuid4().hex})
 
 # API Routes
 @app.route('/api/health', methods=['GET'])
@@ -51,10 +184,10 @@ def upload_rfp():
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        file.save(file_path, buffer_size=UPLOAD_CHUNK_SIZE)
         
         # Generate a unique RFP ID
-        rfp_id = f"RFP-{filename.split('.')[0]}-{os.path.getmtime(file_path)}"
+        rfp_id = f"RFP-{filename.split('.')[0]}-{uuid.uuid4().hex[:12]}"
         
         return jsonify({
             "id": rfp_id,
@@ -74,11 +207,18 @@ def analyze_rfp(rfp_id):
     if not file_path or not os.path.exists(file_path):
         return jsonify({"error": "File not found"}), 404
     
-    try:
-        # Initialize the input processor and RFP analyzer
+    def analyze(file_path, rfp_id):
         processed_text = agent.input_processor.process_document(file_path=file_path)
         rfp_analysis_data = agent.rfp_analyzer.extract_key_information(rfp_text_content=processed_text)
         rfp_analysis_data["rfp_id"] = rfp_id
+        return rfp_analysis_data
+
+    try:
+        # Run the input processor and RFP analyzer on the agent executor
+        future = submit_agent_job("analyze", analyze, file_path, rfp_id)
+        if future is None:
+            return jsonify({"error": "Too many concurrent analysis requests, try again later"}), 429
+        rfp_analysis_data = future.result()
         
         return jsonify({
             "id": rfp_id,
@@ -103,35 +243,54 @@ def generate_proposal():
     if not os.path.exists(file_path):
         return jsonify({"error": "RFP file not found"}), 404
     
+    request_ctx.set({**request_ctx.get(), "settings": settings})
+    
+    proposal_id = f"PROP-{rfp_id}-{uuid.uuid4().hex[:12]}"
+    with proposal_jobs_lock:
+        evict_expired_proposal_jobs()
+        proposal_jobs[proposal_id] = {
+            "status": "queued",
+            "progress": 0,
+            "message": "Proposal generation queued",
+            "output_files": None
+        }
+    
     try:
-        # Process the RFP and generate a proposal
-        output_file_paths = agent.process_rfp(file_path, rfp_id, title)
-        
-        if not output_file_paths:
-            return jsonify({"error": "Failed to generate proposal"}), 500
-        
-        proposal_id = f"PROP-{rfp_id}-{int(os.path.getmtime(output_file_paths.get('markdown_proposal', '')))}"
+        # Process the RFP and generate a proposal in the background
+        future = submit_agent_job("generate", run_proposal_job, proposal_id, file_path, rfp_id, title)
+        if future is None:
+            with proposal_jobs_lock:
+                del proposal_jobs[proposal_id]
+            return jsonify({"error": "Too many concurrent proposal requests, try again later"}), 429
         
         return jsonify({
             "id": proposal_id,
             "title": title,
             "rfpId": rfp_id,
-            "status": "in_progress",
-            "output_files": output_file_paths
-        }), 201
+            "status": "queued"
+        }), 202
     except Exception as e:
         logging.error(f"Error generating proposal: {e}", exc_info=True)
+        with proposal_jobs_lock:
+            proposal_jobs.pop(proposal_id, None)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/proposal/<proposal_id>/status', methods=['GET'])
 def get_proposal_status(proposal_id):
-    # In a real implementation, this would check the actual status
-    # For now, we'll simulate a status check
+    with proposal_jobs_lock:
+        evict_expired_proposal_jobs()
+        job = proposal_jobs.get(proposal_id)
+        job = dict(job) if job else None
+    
+    if job is None:
+        return jsonify({"error": "Proposal not found"}), 404
+    
     return jsonify({
         "id": proposal_id,
-        "status": "completed",
-        "progress": 100,
-        "message": "Proposal generation completed successfully"
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "output_files": job["output_files"]
     }), 200
 
 @app.route('/api/proposal/<proposal_id>', methods=['GET'])
@@ -148,16 +307,17 @@ def get_proposal(proposal_id):
     proposals_dir = './generated_proposals'
     
     try:
-        # Find the markdown proposal file
-        proposal_files = [f for f in os.listdir(proposals_dir) if f.endswith('.md')]
+        # Find the markdown proposal files in a single directory scan
+        with os.scandir(proposals_dir) as entries:
+            proposal_files = [entry for entry in entries if entry.name.endswith('.md')]
         if not proposal_files:
             return jsonify({"error": "Proposal not found"}), 404
         
-        # Sort by modification time (newest first)
-        proposal_files.sort(key=lambda f: os.path.getmtime(os.path.join(proposals_dir, f)), reverse=True)
-        latest_proposal = proposal_files[0]
+        # Pick the most recently modified one
+        latest_entry = max(proposal_files, key=lambda entry: entry.stat().st_mtime)
+        latest_proposal = latest_entry.name
         
-        with open(os.path.join(proposals_dir, latest_proposal), 'r') as f:
+        with open(latest_entry.path, 'r') as f:
             content = f.read()
         
         # Parse the content into sections (simplified)
@@ -189,40 +349,15 @@ def search_knowledge():
     try:
         # Search the knowledge base
         results = []
+        query_lower = query.lower()
         
-        # Read insights file
-        insights_file = os.path.join('./knowledge_base_data', 'rfp_insights.json')
-        if os.path.exists(insights_file):
-            with open(insights_file, 'r') as f:
-                insights = json.load(f)
-                for insight in insights:
-                    if query.lower() in insight.get('content', '').lower() or not query:
-                        if category == 'all' or category == 'rfp_insights':
-                            results.append({
-                                "id": insight.get('id', ''),
-                                "title": insight.get('insight_type', ''),
-                                "content": insight.get('content', ''),
-                                "category": "rfp_insights",
-                                "keywords": insight.get('keywords', []),
-                                "date": insight.get('timestamp', '')
-                            })
-        
-        # Read best practices file
-        practices_file = os.path.join('./knowledge_base_data', 'best_practices.json')
-        if os.path.exists(practices_file):
-            with open(practices_file, 'r') as f:
-                practices = json.load(f)
-                for practice in practices:
-                    if query.lower() in practice.get('description', '').lower() or not query:
-                        if category == 'all' or category == 'best_practices':
-                            results.append({
-                                "id": practice.get('id', ''),
-                                "title": practice.get('title', ''),
-                                "content": practice.get('description', ''),
-                                "category": "best_practices",
-                                "keywords": practice.get('keywords', []),
-                                "date": practice.get('timestamp', '')
-                            })
+        for source_category, filename, title_field, content_field in KNOWLEDGE_SOURCES:
+            if category != 'all' and category != source_category:
+                continue
+            kb_file = os.path.join(KNOWLEDGE_BASE_DIR, filename)
+            for content_lower, result in load_knowledge_entries(kb_file, source_category, title_field, content_field):
+                if query_lower in content_lower:
+                    results.append(result)
         
         return jsonify(results), 200
     except Exception as e:
@@ -268,6 +403,9 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
+    ctx = request_ctx.get()
+    if ctx:
+        response.headers['X-Request-ID'] = ctx["request_id"]
     return response
 
 if __name__ == '__main__':
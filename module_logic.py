@@ -9,19 +9,272 @@ This module is responsible for:
 """
 
 import os
+import io
+import logging
 import subprocess
 import re
+import atexit
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from PIL import Image # For image processing with Tesseract
 import pytesseract # For OCR
 import docx # For .docx files
+from docx.oxml.ns import qn
+
+try:
+    import tesserocr # Persistent Tesseract API: loads the language model once per process
+except ImportError:
+    tesserocr = None # Fall back to pytesseract, which runs the tesseract binary per image
 
 # For PDF processing, we'll use pdftotext (from poppler-utils, assumed installed)
 # and Tesseract for image-based PDFs or images within PDFs.
 
+# PDFs at least this large are split into page ranges of PDF_PAGES_PER_CHUNK pages
+# that are extracted by concurrent pdftotext processes.
+PDF_PARALLEL_MIN_BYTES = 10 * 1024 * 1024
+PDF_PAGES_PER_CHUNK = 250
+
+# Pages whose text layer has fewer non-whitespace characters than this are treated as
+# scanned and OCRed (pdftotext -layout pads pages with spaces and blank lines)
+MIN_PAGE_TEXT_CHARS = 100
+
+# Images at least twice this wide (about a 300 DPI letter-size page) are reduced by an
+# integer factor before OCR, never below this width
+OCR_MAX_IMAGE_WIDTH = 2550
+
+# Upper bound on pages rendered by one pdftoppm call for OCR (bounds the in-memory image data)
+OCR_MAX_PAGES_PER_SHARD = 16
+
+_MULTI_NEWLINE_RE = re.compile(r"\n{3,}")
+_PGM_HEADER_RE = re.compile(rb"P5\s+(\d+)\s+(\d+)\s+(\d+)\s")
+
+# Per-process tesserocr handle, created on first use. PyTessBaseAPI isn't thread-safe,
+# so calls on it are serialized with _tess_api_lock.
+_tess_api = None
+_tess_api_lock = threading.Lock()
+
+def _get_tess_api():
+    global _tess_api
+    if _tess_api is None:
+        _tess_api = tesserocr.PyTessBaseAPI(lang="eng", oem=tesserocr.OEM.LSTM_ONLY, psm=tesserocr.PSM.AUTO)
+        atexit.register(_tess_api.End)
+    return _tess_api
+
+# Persistent OCR results keyed by a hash of the image bytes and the OCR setup, so repeated
+# pages (cover sheets, boilerplate) are only OCRed once. SQLite lets the OCR worker
+# processes share it. Rows older than OCR_CACHE_MAX_AGE are expired and at most
+# OCR_CACHE_MAX_ROWS of the newest are kept; both are enforced on about one in every
+# OCR_CACHE_PRUNE_INTERVAL inserts. The inserts are sampled rather than counted, because
+# OCR worker processes are short-lived and per-process counts rarely reach the interval.
+# Stored next to this module unless OCR_CACHE_DIR is set, not in the working directory
+OCR_CACHE_PATH = os.path.join(os.environ.get("OCR_CACHE_DIR") or os.path.dirname(os.path.abspath(__file__)),
+                              ".ocr_cache.sqlite3")
+OCR_CACHE_MAX_AGE = 30 * 24 * 3600
+OCR_CACHE_MAX_ROWS = 100_000
+OCR_CACHE_PRUNE_INTERVAL = 1000
+# Bump when _prepare_for_ocr changes, so texts from the old preprocessing aren't served
+OCR_CACHE_VERSION = 2
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+_ocr_cache_tag = None
+
+def _get_ocr_cache_tag():
+    """Backend, engine version and settings the cached texts depend on, hashed into every key."""
+    global _ocr_cache_tag
+    if _ocr_cache_tag is None:
+        if tesserocr:
+            engine = f"tesserocr/{tesserocr.tesseract_version().splitlines()[0]}/lang=eng/oem=lstm/psm=auto"
+        else:
+            try:
+                version = pytesseract.get_tesseract_version()
+            except Exception:
+                version = "unknown"
+            engine = f"pytesseract/tesseract {version}/lang=eng/oem=default/psm=default"
+        _ocr_cache_tag = f"v{OCR_CACHE_VERSION}/{engine}/max_width={OCR_MAX_IMAGE_WIDTH}".encode()
+    return _ocr_cache_tag
+
+def _prune_ocr_cache(cache):
+    cache.execute("DELETE FROM ocr_results WHERE created_at < ?", (time.time() - OCR_CACHE_MAX_AGE,))
+    cache.execute("DELETE FROM ocr_results WHERE created_at < (SELECT created_at FROM ocr_results "
+                  "ORDER BY created_at DESC LIMIT 1 OFFSET ?)", (OCR_CACHE_MAX_ROWS,))
+    cache.commit()
+
+def _get_ocr_cache():
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = sqlite3.connect(OCR_CACHE_PATH, timeout=30, check_same_thread=False)
+        _ocr_cache.execute("PRAGMA journal_mode=WAL")
+        _ocr_cache.execute("CREATE TABLE IF NOT EXISTS ocr_results "
+                           "(digest TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)")
+        _ocr_cache.execute("CREATE INDEX IF NOT EXISTS ocr_results_created_at ON ocr_results (created_at)")
+    return _ocr_cache
+
+def _cached_ocr(image_bytes, run_ocr):
+    """Returns the cached OCR text for image_bytes, or calls run_ocr() and caches its result."""
+    key = hashlib.blake2b(_get_ocr_cache_tag(), digest_size=16)
+    key.update(image_bytes)
+    digest = key.hexdigest()
+    try:
+        with _ocr_cache_lock:
+            row = _get_ocr_cache().execute("SELECT text FROM ocr_results WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            return row[0]
+    except sqlite3.Error as e:
+        logging.warning(f"OCR cache lookup failed: {e}")
+
+    text = run_ocr()
+    try:
+        with _ocr_cache_lock:
+            cache = _get_ocr_cache()
+            cache.execute("INSERT OR REPLACE INTO ocr_results (digest, text, created_at) VALUES (?, ?, ?)",
+                          (digest, text, time.time()))
+            cache.commit()
+            if random.randrange(OCR_CACHE_PRUNE_INTERVAL) == 0:
+                _prune_ocr_cache(cache)
+    except sqlite3.Error as e:
+        logging.warning(f"OCR cache update failed: {e}")
+    return text
+
+def _init_ocr_worker():
+    """OCR worker initializer: pages already run in parallel, so give Tesseract one OpenMP thread."""
+    global _tess_api, _tess_api_lock, _ocr_cache, _ocr_cache_lock
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    # Don't reuse handles, connections or lock state inherited from the parent process
+    _tess_api = None
+    _tess_api_lock = threading.Lock()
+    _ocr_cache = None
+    _ocr_cache_lock = threading.Lock()
+
+def _prepare_for_ocr(image):
+    """Converts an image to grayscale and downscales very high-resolution scans before OCR."""
+    if image.mode == "P" and "transparency" in image.info:
+        image = image.convert("RGBA")
+    if "A" in image.getbands():
+        # Flatten onto white as pytesseract does, or transparent backgrounds turn black
+        background = Image.new("L", image.size, 255)
+        background.paste(image.convert("L"), mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "L":
+        # Includes bilevel ("1") scans, which Image.reduce doesn't support
+        image = image.convert("L")
+    # Tesseract's runtime grows with pixel count; ~300 DPI is plenty for printed text
+    factor = image.width // OCR_MAX_IMAGE_WIDTH
+    if factor > 1:
+        image = image.reduce(factor)
+    return image
+
+def _ocr_image(image):
+    """Performs OCR on a PIL image and returns the raw text."""
+    image = _prepare_for_ocr(image)
+    if tesserocr:
+        with _tess_api_lock:
+            api = _get_tess_api()
+            api.SetImage(image)
+            return api.GetUTF8Text()
+    # pytesseract always hands Tesseract a temp file saved in image.format, PNG when unset;
+    # netpbm is written uncompressed, so skip the zlib (or lossy JPEG) re-encode per page
+    image.format = "PPM"
+    return pytesseract.image_to_string(image)
+
+def _ocr_image_file(image_path):
+    """Performs OCR on a single image file and returns the raw text."""
+    try:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+        return _cached_ocr(image_bytes, lambda: _ocr_image(Image.open(io.BytesIO(image_bytes))))
+    except Exception as e:
+        logging.error(f"Error performing OCR on image {image_path}: {e}")
+        return ""
+
+def _split_pgm_stream(data):
+    """Splits pdftoppm's concatenated binary PGM output into the bytes of each page image."""
+    images = []
+    pos = 0
+    while pos < len(data):
+        match = _PGM_HEADER_RE.match(data, pos)
+        if not match:
+            raise ValueError(f"Unexpected pdftoppm output at byte {pos}")
+        width, height, maxval = (int(value) for value in match.groups())
+        end = match.end() + width * height * (1 if maxval < 256 else 2)
+        images.append(data[pos:end])
+        pos = end
+    return images
+
+def _ocr_pdf_page_range(file_path, first_page, last_page):
+    """Renders a range of PDF pages in memory and returns their raw OCR texts, in page order. Runs in OCR worker processes."""
+    # Without an output root, pdftoppm writes the page images to stdout; -gray makes them
+    # 8-bit PGMs, a third of the size of colour PPM and already what Tesseract works on
+    result = subprocess.run(["pdftoppm", "-gray", "-f", str(first_page), "-l", str(last_page), file_path],
+                            capture_output=True, check=True)
+    page_images = _split_pgm_stream(result.stdout)
+    logging.debug("Performing OCR on pages %d-%d of %s", first_page, last_page, file_path)
+    ocr_texts = []
+    for page_number, image_bytes in zip(range(first_page, last_page + 1), page_images):
+        try:
+            ocr_texts.append(_cached_ocr(image_bytes, lambda: _ocr_image(Image.open(io.BytesIO(image_bytes)))))
+        except Exception as e:
+            logging.error(f"Error performing OCR on page {page_number} of {file_path}: {e}")
+            ocr_texts.append("")
+    # Keep one entry per requested page even if pdftoppm rendered fewer
+    ocr_texts += [""] * (last_page - first_page + 1 - len(ocr_texts))
+    return ocr_texts
+
+def _page_shards(page_numbers, max_pages):
+    """Groups ascending page numbers into [first, last] runs of consecutive pages, each at most max_pages long."""
+    shards = []
+    for page_number in page_numbers:
+        if shards and page_number == shards[-1][1] + 1 and page_number - shards[-1][0] < max_pages:
+            shards[-1][1] = page_number
+        else:
+            shards.append([page_number, page_number])
+    return shards
+
+_W_P, _W_R, _W_HYPERLINK = qn("w:p"), qn("w:r"), qn("w:hyperlink")
+_W_T, _W_BR, _W_TYPE = qn("w:t"), qn("w:br"), qn("w:type")
+# Fixed text of the other run children python-docx includes in Run.text
+_W_RUN_CHARS = {qn("w:tab"): "\t", qn("w:ptab"): "\t", qn("w:cr"): "\n", qn("w:noBreakHyphen"): "-"}
+
+def _docx_run_text(run):
+    parts = []
+    for child in run:
+        if child.tag == _W_T:
+            parts.append(child.text or "")
+        elif child.tag == _W_BR:
+            # Only line breaks are text; page and column breaks are ""
+            if child.get(_W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif child.tag in _W_RUN_CHARS:
+            parts.append(_W_RUN_CHARS[child.tag])
+    return "".join(parts)
+
+def _docx_paragraph_text(paragraph):
+    """Text of a <w:p> element as python-docx's Paragraph.text gives it: its direct runs and
+    hyperlink runs, but not runs nested in tracked insertions, fields or text boxes."""
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            parts.append(_docx_run_text(child))
+        elif child.tag == _W_HYPERLINK:
+            parts.extend(_docx_run_text(run) for run in child.iterchildren(_W_R))
+    return "".join(parts)
+
+# Extension -> InputProcessor method used by process_document
+_DISPATCH = {".txt": "process_txt", ".docx": "process_docx", ".pdf": "process_pdf"}
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"})
+
 class InputProcessor:
-    def __init__(self):
-        """Initializes the InputProcessor."""
-        print("InputProcessor initialized.")
+    def __init__(self, max_workers=None):
+        """Initializes the InputProcessor.
+
+        max_workers caps the OCR and pdftotext processes run in parallel for one PDF
+        (default: one per CPU).
+        """
+        self.max_workers = max_workers
+        logging.debug("InputProcessor initialized.")
         # Ensure tesseract is in PATH or specify its location if needed
         # Example: pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'
 
@@ -29,125 +282,160 @@ class InputProcessor:
         """Basic text cleaning: remove excessive newlines, leading/trailing whitespace."""
         if not text:
             return ""
-        text = re.sub(r"\n{3,}", "\n\n", text) # Replace 3+ newlines with 2
-        text = text.strip()
-        return text
+        return _MULTI_NEWLINE_RE.sub("\n\n", text).strip() # Replace 3+ newlines with 2
 
     def process_txt(self, file_path):
         """Processes a .txt file."""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                text = f.read()
+            # Read raw bytes and decode once rather than through a text-mode wrapper
+            with open(file_path, "rb") as f:
+                text = f.read().decode("utf-8", errors="replace")
+            if "\r" in text:
+                text = text.replace("\r\n", "\n").replace("\r", "\n") # Same newline handling as text mode
             return self._clean_text(text)
         except Exception as e:
-            print(f"Error processing TXT file {file_path}: {e}")
+            logging.error(f"Error processing TXT file {file_path}: {e}")
             return None
 
     def process_docx(self, file_path):
         """Processes a .docx file."""
         try:
             doc = docx.Document(file_path)
-            full_text = []
-            for para in doc.paragraphs:
-                full_text.append(para.text)
-            return self._clean_text("\n".join(full_text))
+            # Walk the body's paragraph elements directly instead of building Paragraph/Run objects
+            paragraphs = doc.element.body.iterchildren(_W_P)
+            return self._clean_text("\n".join(_docx_paragraph_text(para) for para in paragraphs))
         except Exception as e:
-            print(f"Error processing DOCX file {file_path}: {e}")
+            logging.error(f"Error processing DOCX file {file_path}: {e}")
             return None
 
     def _ocr_image_to_text(self, image_path):
         """Performs OCR on a single image file."""
+        return self._clean_text(_ocr_image_file(image_path))
+
+    def _pdf_page_count(self, file_path):
+        """Returns the page count reported by pdfinfo, or None if it can't be determined."""
         try:
-            text = pytesseract.image_to_string(Image.open(image_path))
-            return self._clean_text(text)
-        except Exception as e:
-            print(f"Error performing OCR on image {image_path}: {e}")
-            return ""
+            result = subprocess.run(["pdfinfo", file_path], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            logging.warning(f"pdfinfo failed for {file_path}: {e}")
+            return None
+        match = re.search(r"^Pages:\s+(\d+)", result.stdout.decode("utf-8", errors="replace"), re.MULTILINE)
+        return int(match.group(1)) if match else None
+
+    def _pdftotext(self, file_path, first_page=None, last_page=None):
+        """Runs pdftotext on the whole file or on an inclusive page range."""
+        command = ["pdftotext", "-layout"]
+        if first_page is not None:
+            command += ["-f", str(first_page), "-l", str(last_page)]
+        # pdftotext writes UTF-8; decode it explicitly instead of with the locale's encoding
+        result = subprocess.run(command + [file_path, "-"], capture_output=True, check=True)
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def _extract_pdf_text(self, file_path):
+        """
+        Extracts the text layer of a PDF with pdftotext.
+        Large PDFs are split into page ranges extracted concurrently (one pdftotext
+        process per range) and joined back in page order.
+        """
+        page_count = None
+        if os.path.getsize(file_path) >= PDF_PARALLEL_MIN_BYTES:
+            page_count = self._pdf_page_count(file_path)
+        if not page_count or page_count <= PDF_PAGES_PER_CHUNK:
+            return self._pdftotext(file_path)
+
+        page_ranges = [(first, min(first + PDF_PAGES_PER_CHUNK - 1, page_count))
+                       for first in range(1, page_count + 1, PDF_PAGES_PER_CHUNK)]
+        workers = min(self.max_workers or os.cpu_count() or 1, len(page_ranges))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return "".join(executor.map(lambda page_range: self._pdftotext(file_path, *page_range), page_ranges))
+
+    def _ocr_pdf_pages(self, file_path, page_numbers):
+        """Renders the given (1-based) PDF pages in memory and OCRs them in parallel, in order."""
+        # Pages are split into shards of consecutive pages. Each worker process renders a shard
+        # with one pdftoppm call and OCRs it, so rendering of later shards overlaps OCR of
+        # earlier ones and page images never go through the filesystem.
+        logging.info(f"Performing OCR on {len(page_numbers)} pages of {file_path}...")
+        workers = min(self.max_workers or os.cpu_count() or 1, len(page_numbers))
+        shard_size = min(OCR_MAX_PAGES_PER_SHARD, -(-len(page_numbers) // workers))
+        shards = _page_shards(page_numbers, shard_size)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker) as executor:
+            futures = [executor.submit(_ocr_pdf_page_range, file_path, first_page, last_page) for first_page, last_page in shards]
+            return [self._clean_text(page_text) for future in futures for page_text in future.result()]
 
     def process_pdf(self, file_path):
         """
         Processes a .pdf file.
-        First attempts to extract text directly using pdftotext.
-        If that yields little or no text (suggesting an image-based PDF),
-        it then attempts to convert PDF pages to images and OCR them.
+        First extracts the text layer of every page using pdftotext.
+        Pages that yield little or no text (scanned pages) are then converted
+        to images and OCRed, and their OCR text replaces them in page order.
         """
-        extracted_text = ""
+        page_texts = []
         try:
-            # Attempt direct text extraction using pdftotext
-            result = subprocess.run(["pdftotext", file_path, "-"], capture_output=True, text=True, check=True)
-            extracted_text = self._clean_text(result.stdout)
+            # Attempt direct text extraction using pdftotext; pdftotext ends every page with a form feed
+            raw_text = self._extract_pdf_text(file_path)
+            page_texts = raw_text.split("\f")
+            if raw_text.endswith("\f"):
+                page_texts.pop()
         except subprocess.CalledProcessError as e:
-            print(f"pdftotext error for {file_path}: {e}. Will attempt OCR.")
+            logging.warning(f"pdftotext error for {file_path}: {e}. Will attempt OCR.")
         except FileNotFoundError:
-            print("pdftotext command not found. Please ensure poppler-utils is installed. Will attempt OCR if possible.")
+            logging.warning("pdftotext command not found. Please ensure poppler-utils is installed. Will attempt OCR if possible.")
         except Exception as e:
-            print(f"Error during pdftotext processing for {file_path}: {e}. Will attempt OCR.")
-
-        # If direct text extraction is insufficient (e.g., less than 100 characters for a multi-page doc, or failed),
-        # or if we want to supplement with OCR for images within the PDF.
-        # For simplicity here, if pdftotext fails or gives very short text, we try full OCR.
-        # A more advanced version would detect images within text-based PDFs and OCR them selectively.
-        if not extracted_text or len(extracted_text) < 100: # Arbitrary threshold for "insufficient text"
-            print(f"Direct text extraction from {file_path} was insufficient or failed. Attempting OCR...")
-            ocr_texts = []
-            temp_image_dir = "/tmp/pdf_pages_for_ocr"
-            os.makedirs(temp_image_dir, exist_ok=True)
-            
-            try:
-                # Convert PDF pages to images (e.g., PPM using pdftoppm from poppler-utils)
-                subprocess.run(["pdftoppm", "-png", file_path, os.path.join(temp_image_dir, "page")], check=True)
-                image_files = sorted([os.path.join(temp_image_dir, f) for f in os.listdir(temp_image_dir) if f.startswith("page") and f.endswith(".png")])
-                
-                if not image_files:
-                    print(f"No images generated from PDF {file_path} for OCR.")
-                    # Fallback to any text extracted by pdftotext earlier, even if minimal
-                    return extracted_text if extracted_text else None 
-
-                for i, img_path in enumerate(image_files):
-                    print(f"Performing OCR on page {i+1} of {file_path}...")
-                    page_text = self._ocr_image_to_text(img_path)
-                    ocr_texts.append(page_text)
-                    os.remove(img_path) # Clean up temporary image file
-                
-                # Clean up directory if empty
-                if not os.listdir(temp_image_dir):
-                    os.rmdir(temp_image_dir)
-                
-                extracted_text = "\n\n--- Page Break ---\n\n".join(ocr_texts) # Join OCRed text from all pages
-                extracted_text = self._clean_text(extracted_text)
-            except subprocess.CalledProcessError as e:
-                print(f"pdftoppm error for {file_path}: {e}. OCR attempt failed.")
-                return extracted_text if extracted_text else None # Return whatever pdftotext got, or None
-            except FileNotFoundError:
-                print("pdftoppm command not found. Please ensure poppler-utils is installed. OCR attempt failed.")
-                return extracted_text if extracted_text else None
-            except Exception as e:
-                print(f"Error during PDF to image conversion or OCR for {file_path}: {e}")
-                return extracted_text if extracted_text else None
-        
+            logging.warning(f"Error during pdftotext processing for {file_path}: {e}. Will attempt OCR.")
+
+        if not page_texts:
+            # No text layer could be extracted at all, so every page needs OCR
+            page_texts = [""] * (self._pdf_page_count(file_path) or 0)
+        extracted_text = self._clean_text("\f".join(page_texts))
+
+        # Only pages whose text layer is insufficient (e.g., scanned pages) are OCRed
+        ocr_page_indexes = [i for i, page_text in enumerate(page_texts) if len("".join(page_text.split())) < MIN_PAGE_TEXT_CHARS]
+        if not ocr_page_indexes:
+            return extracted_text if extracted_text else None
+
+        logging.info(f"Direct text extraction was insufficient for {len(ocr_page_indexes)} of {len(page_texts)} pages of {file_path}. Attempting OCR...")
+        try:
+            ocr_texts = self._ocr_pdf_pages(file_path, [i + 1 for i in ocr_page_indexes])
+        except subprocess.CalledProcessError as e:
+            logging.error(f"pdftoppm error for {file_path}: {e}. OCR attempt failed.")
+            return extracted_text if extracted_text else None # Return whatever pdftotext got, or None
+        except FileNotFoundError:
+            logging.error("pdftoppm command not found. Please ensure poppler-utils is installed. OCR attempt failed.")
+            return extracted_text if extracted_text else None
+        except Exception as e:
+            logging.error(f"Error during PDF to image conversion or OCR for {file_path}: {e}")
+            return extracted_text if extracted_text else None
+
+        # Merge OCR results back in at their page positions, keeping the text layer where OCR found nothing
+        merged_pages = [self._clean_text(page_text) for page_text in page_texts]
+        for i, ocr_text in zip(ocr_page_indexes, ocr_texts):
+            if ocr_text:
+                merged_pages[i] = ocr_text
+        extracted_text = "\n\n--- Page Break ---\n\n".join(merged_pages) # Join text from all pages
+        # Pages are already cleaned (stripped, no 3+ newline runs), so the join only needs
+        # another pass when empty pages put separators next to each other
+        if not all(merged_pages):
+            extracted_text = self._clean_text(extracted_text)
+
         return extracted_text if extracted_text else None
 
     def process_document(self, file_path):
         """Detects file type and processes accordingly."""
         if not os.path.exists(file_path):
-            print(f"Error: File not found at {file_path}")
+            logging.error(f"Error: File not found at {file_path}")
             return None
 
         _, extension = os.path.splitext(file_path.lower())
-        print(f"Processing document: {file_path} (type: {extension})")
-
-        if extension == ".txt":
-            return self.process_txt(file_path)
-        elif extension == ".docx":
-            return self.process_docx(file_path)
-        elif extension == ".pdf":
-            return self.process_pdf(file_path)
-        elif extension in [".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".gif"]:
-            print("Processing as a direct image file for OCR.")
+        logging.info(f"Processing document: {file_path} (type: {extension})")
+
+        handler = _DISPATCH.get(extension)
+        if handler:
+            return getattr(self, handler)(file_path)
+        if extension in _IMAGE_EXTS:
+            logging.debug("Processing as a direct image file for OCR.")
             return self._ocr_image_to_text(file_path)
-        else:
-            print(f"Unsupported file type: {extension} for file {file_path}")
-            return None
+        logging.warning(f"Unsupported file type: {extension} for file {file_path}")
+        return None
 
 # Example usage (for testing purposes within this file)
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import os
 import sys
 import logging
 import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
 # Ensure the agent module can be found
 # This assumes run_proposal_agent.py is in the same directory as agent.py
@@ -12,13 +14,85 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 
 from agent import AiRfpAgent # Assuming agent.py is in the same directory or accessible via PYTHONPATH
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(module)s - %(message)s')
+
+# RFP documents picked up from --input-dir
+BATCH_RFP_EXTENSIONS = {'.pdf', '.docx', '.txt'}
+
+# Agent used by a batch worker process, created once by _init_agent and reused for every file
+_AGENT = None
+
+def _init_agent(ocr_workers):
+    global _AGENT
+    # Workers don't write the knowledge base themselves: concurrent read-modify-write of
+    # the KB files from several processes loses entries. _run_one hands the updates back
+    # to the parent, which applies them through a single writer.
+    _AGENT = AiRfpAgent(ocr_workers=ocr_workers, kb_writer=False)
+
+def _run_one(rfp_file_path, proposal_title):
+    """Processes one RFP with the worker's agent and returns its output file paths and KB updates."""
+    rfp_id = f"AGENT-RUN-{uuid.uuid4().hex[:8]}"
+    logging.info(f"Processing RFP: {rfp_file_path} with Title: {proposal_title} and ID: {rfp_id}")
+    output_file_paths = _AGENT.process_rfp(rfp_file_path=rfp_file_path, rfp_id=rfp_id, proposal_title=proposal_title)
+    return output_file_paths, _AGENT.take_kb_updates()
+
+def run_batch(input_dir, proposal_title, max_workers=None):
+    """Processes every RFP document in input_dir, sharing one agent per worker process."""
+    rfp_files = sorted(str(p) for p in Path(input_dir).iterdir() if p.is_file() and p.suffix.lower() in BATCH_RFP_EXTENSIONS)
+    if not rfp_files:
+        logging.warning(f"No RFP documents found in {input_dir}")
+        print(f"No RFP documents ({', '.join(sorted(BATCH_RFP_EXTENSIONS))}) found in {input_dir}")
+        return
+
+    workers = max_workers or min(len(rfp_files), os.cpu_count() or 1)
+    # Each worker OCRs with its own process pool; split the CPUs between them
+    ocr_workers = max(1, (os.cpu_count() or 1) // workers)
+    kb_agent = AiRfpAgent()
+    logging.info(f"Processing {len(rfp_files)} RFPs from {input_dir} with {workers} worker processes "
+                 f"({ocr_workers} OCR processes each)...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_agent, initargs=(ocr_workers,)) as executor:
+        futures = {
+            executor.submit(_run_one, rfp_file, f"{proposal_title} - {Path(rfp_file).stem}"): rfp_file
+            for rfp_file in rfp_files
+        }
+        for future in as_completed(futures):
+            rfp_file = futures[future]
+            try:
+                output_file_paths, kb_updates = future.result()
+            except Exception as e:
+                logging.error(f"An error occurred while processing {rfp_file}: {e}", exc_info=True)
+                print(f"{rfp_file}: Error: {e}")
+                continue
+            kb_agent.queue_kb_updates(kb_updates)
+            if output_file_paths:
+                print(f"{rfp_file}: Generated proposal documents:")
+                for key, path in output_file_paths.items():
+                    print(f"  {key}: {os.path.abspath(path)}")
+            else:
+                print(f"{rfp_file}: Proposal generation did not produce any output files.")
+    kb_agent.wait_for_kb_updates()
+
 def main():
     parser = argparse.ArgumentParser(description='Run the AI RFP Agent to process an RFP and generate a proposal.')
-    parser.add_argument('rfp_file_path', type=str, help='Path to the RFP document file.')
-    parser.add_argument('proposal_title', type=str, help='Desired title for the proposal.')
+    parser.add_argument('rfp_file_path', type=str, nargs='?', help='Path to the RFP document file (omit with --input-dir).')
+    parser.add_argument('proposal_title', type=str, help='Desired title for the proposal (used as a prefix with --input-dir).')
+    parser.add_argument('--input-dir', type=str, help='Process every .pdf/.docx/.txt RFP in this directory in parallel.')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for --input-dir (default: one per CPU, up to the number of files).')
 
     args = parser.parse_args()
 
+    if args.input_dir:
+        if args.rfp_file_path:
+            parser.error("rfp_file_path and --input-dir are mutually exclusive")
+        if not os.path.isdir(args.input_dir):
+            logging.error(f"Input directory not found: {args.input_dir}")
+            print(f"Error: Input directory not found at {args.input_dir}")
+            return
+        run_batch(args.input_dir, args.proposal_title, max_workers=args.workers)
+        return
+
+    if not args.rfp_file_path:
+        parser.error("rfp_file_path is required unless --input-dir is given")
+
     if not os.path.exists(args.rfp_file_path):
         logging.error(f"RFP file not found: {args.rfp_file_path}")
         print(f"Error: RFP file not found at {args.rfp_file_path}")
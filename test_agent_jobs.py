@@ -0,0 +1,45 @@
+import threading
+import unittest
+
+from flask import Flask, request
+
+# agent_jobs doesn't import the agent, so this runs without the agent module packages
+from agent_jobs import request_ctx, submit_agent_job
+
+app = Flask(__name__)
+
+class SubmitAgentJobContextTest(unittest.TestCase):
+
+    def test_request_context_is_visible_in_executor_job(self):
+        def job():
+            return threading.get_ident(), request_ctx.get(), request.headers.get('X-Request-ID')
+
+        with app.test_request_context('/api/health', headers={'X-Request-ID': 'req-123'}):
+            request_ctx.set({"request_id": "req-123", "settings": {"tone": "formal"}})
+            future = submit_agent_job("analyze", job)
+            self.assertIsNotNone(future)
+            thread_id, ctx_value, header = future.result(timeout=10)
+
+        self.assertNotEqual(thread_id, threading.get_ident())
+        self.assertEqual(ctx_value, {"request_id": "req-123", "settings": {"tone": "formal"}})
+        self.assertEqual(header, 'req-123')
+
+    def test_executor_job_does_not_see_later_context_changes(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def job():
+            started.set()
+            release.wait(timeout=10)
+            return request_ctx.get()
+
+        with app.test_request_context('/api/health'):
+            request_ctx.set({"request_id": "first"})
+            future = submit_agent_job("analyze", job)
+            started.wait(timeout=10)
+            request_ctx.set({"request_id": "second"})
+            release.set()
+            self.assertEqual(future.result(timeout=10), {"request_id": "first"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import shutil
+import unittest
+
+from PIL import Image, ImageDraw, ImageFont
+
+import module_logic
+from module_logic import OCR_MAX_IMAGE_WIDTH, InputProcessor, _ocr_image, _prepare_for_ocr
+
+def _bilevel_scan(text, width=5100, height=6600):
+    """A 600-DPI letter-size black-and-white page with one line of large text."""
+    image = Image.new("1", (width, height), 1)
+    ImageDraw.Draw(image).text((300, 600), text, fill=0, font=ImageFont.load_default(size=160))
+    return image
+
+class PrepareForOcrTest(unittest.TestCase):
+
+    def test_wide_bilevel_image_is_reduced(self):
+        prepared = _prepare_for_ocr(_bilevel_scan("BILEVEL"))
+        self.assertEqual(prepared.mode, "L")
+        self.assertEqual(prepared.width, 5100 // 2)
+        self.assertGreaterEqual(prepared.width, OCR_MAX_IMAGE_WIDTH)
+
+    def test_transparent_background_is_flattened_onto_white(self):
+        image = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
+        image.putpixel((5, 5), (0, 0, 0, 255))
+        prepared = _prepare_for_ocr(image)
+        self.assertEqual(prepared.getpixel((0, 0)), 255)
+        self.assertEqual(prepared.getpixel((5, 5)), 0)
+
+    def test_transparent_palette_image_is_flattened_onto_white(self):
+        image = Image.new("P", (10, 10), 0)
+        image.putpalette([0, 0, 0] * 256)
+        image.info["transparency"] = 0
+        self.assertEqual(_prepare_for_ocr(image).getpixel((0, 0)), 255)
+
+class ProcessPdfTest(unittest.TestCase):
+
+    def test_layout_padded_header_only_page_is_ocred(self):
+        # pdftotext -layout output of a scan whose text layer is only a stamped header and
+        # page number: well over MIN_PAGE_TEXT_CHARS characters, almost all of them padding
+        header_only_page = "\n".join([" " * 90 + "ACME CONFIDENTIAL"] + [""] * 50 + [" " * 100 + "1"])
+        text_page = "This page has a real text layer. " * 10
+        processor = InputProcessor()
+        processor._extract_pdf_text = lambda file_path: header_only_page + "\f" + text_page + "\f"
+        ocred_pages = []
+
+        def ocr_pdf_pages(file_path, page_numbers):
+            ocred_pages.extend(page_numbers)
+            return ["Scanned page body text"]
+
+        processor._ocr_pdf_pages = ocr_pdf_pages
+        text = processor.process_pdf("scanned.pdf")
+
+        self.assertEqual(ocred_pages, [1])
+        self.assertTrue(text.startswith("Scanned page body text"))
+        self.assertIn("real text layer", text)
+
+@unittest.skipUnless(shutil.which("tesseract") or module_logic.tesserocr, "Tesseract is not installed")
+class OcrImageTest(unittest.TestCase):
+
+    def test_wide_bilevel_scan_produces_text(self):
+        text = _ocr_image(_bilevel_scan("INVOICE 2025"))
+        self.assertIn("INVOICE", text.upper())
+
+if __name__ == '__main__':
+    unittest.main()